@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+import math
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
@@ -7,11 +8,13 @@ from app.database import get_db
 from app.schemas import UserCreate, UserOut
 from app.crud.users import authenticate_user, create_user, get_user_by_email, get_user_by_username, get_user_by_id
 from app.utils.security import create_access_token, decode_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.utils.rate_limit import client_ip, login_admission
 
 router = APIRouter()
 
 @router.post("/login", response_model=UserOut, status_code=status.HTTP_200_OK)
 async def login(
+    request: Request,
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db)
@@ -19,7 +22,30 @@ async def login(
     """
     Authenticate a user and create a session.
     """
-    user = await authenticate_user(db, form_data.username, form_data.password)
+    # Shed load before charging any rate limit bucket or doing password work
+    if not login_admission.try_acquire():
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        ip = client_ip(
+            request.client.host if request.client else None,
+            request.headers.get("x-forwarded-for"),
+        )
+        retry_after = await login_admission.admit(ip, form_data.username)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        user = await authenticate_user(db, form_data.username, form_data.password)
+        if user:
+            await login_admission.record_success(form_data.username)
+    finally:
+        login_admission.release()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
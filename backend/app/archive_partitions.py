@@ -0,0 +1,28 @@
+import os
+from sqlalchemy import create_engine
+from dotenv import load_dotenv
+from partitions import archive_old_partitions, ARCHIVE_AFTER_MONTHS, ARCHIVE_DIR
+
+# Load environment variables
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
+
+# Get Supabase connection string from environment
+DB_URL = os.getenv("DATABASE_URL")
+if DB_URL and DB_URL.startswith("postgresql+asyncpg://"):
+    # Convert asyncpg URL to psycopg2 URL
+    DB_URL = DB_URL.replace("postgresql+asyncpg://", "postgresql://")
+
+engine = create_engine(DB_URL)
+
+def archive():
+    try:
+        # Detach, export and drop cold message/interaction partitions one at a time
+        archived = archive_old_partitions(engine)
+        for path in archived:
+            print(f"Archived partition to {path}")
+        print(f"Archived {len(archived)} partitions older than {ARCHIVE_AFTER_MONTHS} months into {ARCHIVE_DIR}")
+    except Exception as e:
+        print(f"Error archiving partitions: {e}")
+
+if __name__ == "__main__":
+    archive()
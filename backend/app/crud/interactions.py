@@ -0,0 +1,73 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import tuple_
+from typing import List, Optional
+from datetime import datetime
+
+from app.models import Interaction
+from app.partitions import query_window_start
+from app.schemas import InteractionCreate
+
+# Reads are newest first and paged with a (`before`, `before_id`) cursor taken
+# from the last row of the previous page. Each page is bounded below by `since`,
+# which defaults to QUERY_WINDOW before the cursor so Postgres only scans the
+# partitions in that range; pass an earlier `since` (or datetime.min) to reach further back.
+# A short page therefore means "nothing more in the window", not "no older rows".
+
+def _page(before: Optional[datetime], before_id: Optional[int], since: Optional[datetime]):
+    """Keyset conditions: `since` <= timestamp and (timestamp, id) < (`before`, `before_id`)"""
+    conditions = [Interaction.timestamp >= (since if since is not None else query_window_start(before))]
+    if before is not None:
+        if before_id is None:
+            conditions.append(Interaction.timestamp < before)
+        else:
+            conditions.append(tuple_(Interaction.timestamp, Interaction.id) < tuple_(before, before_id))
+    return conditions
+
+async def get_interactions_for_user(
+    db: AsyncSession,
+    user_id: int,
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    limit: int = 100,
+) -> List[Interaction]:
+    """Get a user's interactions, newest first. Pass the last row's `timestamp`/`id` as `before`/`before_id` for the next page"""
+    result = await db.execute(
+        select(Interaction)
+        .where(Interaction.user_id == user_id, *_page(before, before_id, since))
+        .order_by(Interaction.timestamp.desc(), Interaction.id.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def get_interactions_for_contact(
+    db: AsyncSession,
+    contact_id: int,
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    limit: int = 100,
+) -> List[Interaction]:
+    """Get interactions with a contact, newest first. Pass the last row's `timestamp`/`id` as `before`/`before_id` for the next page"""
+    result = await db.execute(
+        select(Interaction)
+        .where(Interaction.contact_id == contact_id, *_page(before, before_id, since))
+        .order_by(Interaction.timestamp.desc(), Interaction.id.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def create_interaction(db: AsyncSession, interaction_in: InteractionCreate) -> Interaction:
+    """Create a new interaction"""
+    db_interaction = Interaction(
+        user_id=interaction_in.userId,
+        contact_id=interaction_in.contactId,
+        type=interaction_in.type,
+        timestamp=interaction_in.timestamp,
+        notes=interaction_in.notes
+    )
+    db.add(db_interaction)
+    await db.commit()
+    await db.refresh(db_interaction)
+    return db_interaction
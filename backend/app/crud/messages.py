@@ -0,0 +1,90 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import or_, and_, tuple_
+from typing import List, Optional
+from datetime import datetime
+
+from app.models import Message
+from app.partitions import query_window_start
+from app.schemas import MessageCreate
+
+# Reads are newest first and paged with a (`before`, `before_id`) cursor taken
+# from the last row of the previous page. Each page is bounded below by `since`,
+# which defaults to QUERY_WINDOW before the cursor so Postgres only scans the
+# partitions in that range; pass an earlier `since` (or datetime.min) to reach further back.
+# A short page therefore means "nothing more in the window", not "no older rows".
+
+def _page(before: Optional[datetime], before_id: Optional[int], since: Optional[datetime]):
+    """Keyset conditions: `since` <= created_at and (created_at, id) < (`before`, `before_id`)"""
+    conditions = [Message.created_at >= (since if since is not None else query_window_start(before))]
+    if before is not None:
+        if before_id is None:
+            conditions.append(Message.created_at < before)
+        else:
+            conditions.append(tuple_(Message.created_at, Message.id) < tuple_(before, before_id))
+    return conditions
+
+async def get_message(db: AsyncSession, message_id: int, created_at: datetime) -> Optional[Message]:
+    """Get a message by its (id, created_at) key"""
+    result = await db.execute(
+        select(Message).where(Message.id == message_id, Message.created_at == created_at)
+    )
+    return result.scalars().first()
+
+async def get_messages_for_user(
+    db: AsyncSession,
+    user_id: int,
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    limit: int = 100,
+) -> List[Message]:
+    """Get messages sent or received by a user, newest first. Pass the last row's `created_at`/`id` as `before`/`before_id` for the next page"""
+    result = await db.execute(
+        select(Message)
+        .where(
+            or_(Message.sender_id == user_id, Message.receiver_id == user_id),
+            *_page(before, before_id, since),
+        )
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def get_conversation(
+    db: AsyncSession,
+    user_id: int,
+    other_user_id: int,
+    before: Optional[datetime] = None,
+    before_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    limit: int = 100,
+) -> List[Message]:
+    """Get messages exchanged between two users, newest first. Pass the last row's `created_at`/`id` as `before`/`before_id` for the next page"""
+    result = await db.execute(
+        select(Message)
+        .where(
+            or_(
+                and_(Message.sender_id == user_id, Message.receiver_id == other_user_id),
+                and_(Message.sender_id == other_user_id, Message.receiver_id == user_id),
+            ),
+            *_page(before, before_id, since),
+        )
+        .order_by(Message.created_at.desc(), Message.id.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def create_message(db: AsyncSession, message_in: MessageCreate) -> Message:
+    """Create a new message"""
+    db_message = Message(
+        sender_id=message_in.senderId,
+        receiver_id=message_in.receiverId,
+        content=message_in.content,
+        status=message_in.status,
+        created_at=datetime.utcnow()
+    )
+    db.add(db_message)
+    await db.commit()
+    await db.refresh(db_message)
+    return db_message
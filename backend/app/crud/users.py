@@ -1,3 +1,4 @@
+import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import update, delete
@@ -6,7 +7,7 @@ from datetime import datetime
 
 from app.models import User
 from app.schemas import UserCreate, UserUpdate
-from app.utils.security import get_password_hash, verify_password
+from app.utils.security import get_password_hash, verify_password, DUMMY_PASSWORD_HASH
 
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get a user by email"""
@@ -67,8 +68,10 @@ async def update_user(db: AsyncSession, user_id: int, user_in: UserUpdate) -> Op
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Authenticate a user by email and password"""
     user = await get_user_by_email(db, email)
-    if not user:
-        return None
-    if not verify_password(password, user.password_hash):
+    # Unknown emails still pay for a hash check so response time doesn't reveal them
+    password_hash = user.password_hash if user else DUMMY_PASSWORD_HASH
+    # bcrypt is CPU-bound; run it off the event loop
+    valid = await asyncio.to_thread(verify_password, password, password_hash)
+    if not user or not valid:
         return None
     return user
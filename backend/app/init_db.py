@@ -1,10 +1,14 @@
 import asyncio
 from database import engine
 from models import Base
+from partitions import ensure_partitions
 
 async def init_models():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        failures = await conn.run_sync(ensure_partitions)
+    if failures:
+        raise RuntimeError(f"Partition setup failed for: {', '.join(failures)}")
     print("Database tables created.")
 
 if __name__ == "__main__":
@@ -3,6 +3,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 from models import Base
+from partitions import ensure_partitions
 
 # Load environment variables
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
@@ -23,6 +24,13 @@ def init_db():
     try:
         # Create all tables
         Base.metadata.create_all(bind=engine)
+        # Create monthly partitions for messages and interactions
+        with engine.begin() as conn:
+            failures = ensure_partitions(conn)
+        if failures:
+            for table, error in failures.items():
+                print(f"Error creating partitions for {table}: {error}")
+            return
         print("Database tables created successfully!")
     except Exception as e:
         print(f"Error creating tables: {e}")
@@ -2,14 +2,19 @@ from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import logging
 import os
 from dotenv import load_dotenv
 
-from app.database import get_db
+from app.database import engine, get_db
+from app.partitions import ensure_partitions
 
 # Load environment variables
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 
+logger = logging.getLogger(__name__)
+
 # Create FastAPI app
 app = FastAPI(
     title="VyneTree API",
@@ -51,14 +56,28 @@ async def health_check(db: AsyncSession = Depends(get_db)):
 # Note: We'll create these router files next
 from app.api import auth
 
+async def maintain_partitions():
+    # Keep future monthly partitions for messages/interactions created
+    while True:
+        try:
+            async with engine.begin() as conn:
+                failures = await conn.run_sync(ensure_partitions)
+            if failures:
+                logger.error("Partition maintenance failed for: %s", ", ".join(failures))
+        except Exception:
+            logger.exception("Partition maintenance failed")
+        await asyncio.sleep(24 * 60 * 60)
+
 @app.on_event("startup")
 async def startup_db_client():
     # You can add any startup tasks here
+    app.state.partition_task = asyncio.create_task(maintain_partitions())
     print("API startup: Database connection initialized")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     # You can add any cleanup tasks here
+    app.state.partition_task.cancel()
     print("API shutdown: Closing database connections")
 
 # Include API routes
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Enum, JSON, Index
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.dialects.postgresql import JSONB
 import enum
+from datetime import datetime
 
 Base = declarative_base()
 
@@ -62,22 +63,38 @@ class Contact(Base):
 
 class Message(Base):
     __tablename__ = "messages"
-    id = Column(Integer, primary_key=True, index=True)
+    # Monthly range partitions on created_at; see app/partitions.py
+    __table_args__ = (
+        # Per-user reads filter on sender/receiver and page newest first
+        Index("ix_messages_sender_id_created_at", "sender_id", "created_at"),
+        Index("ix_messages_receiver_id_created_at", "receiver_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     content = Column(Text, nullable=False)
     status = Column(Enum(MessageStatusEnum), default=MessageStatusEnum.Sent)
-    created_at = Column(DateTime)
+    # Partition key, so it must be part of the primary key; indexed for newest-first scans
+    created_at = Column(DateTime, primary_key=True, nullable=False, default=datetime.utcnow, index=True)
     sender = relationship("User", back_populates="messages_sent", foreign_keys=[sender_id])
     receiver = relationship("User", back_populates="messages_received", foreign_keys=[receiver_id])
 
 class Interaction(Base):
     __tablename__ = "interactions"
-    id = Column(Integer, primary_key=True, index=True)
+    # Monthly range partitions on timestamp; see app/partitions.py
+    __table_args__ = (
+        # Per-user/per-contact reads page newest first
+        Index("ix_interactions_user_id_timestamp", "user_id", "timestamp"),
+        Index("ix_interactions_contact_id_timestamp", "contact_id", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=False)
     type = Column(String, nullable=False)  # Call or Meetup
-    timestamp = Column(DateTime, nullable=False)
+    # Partition key, so it must be part of the primary key; indexed for newest-first scans
+    timestamp = Column(DateTime, primary_key=True, nullable=False, index=True)
     notes = Column(Text, nullable=True)
     contact = relationship("Contact", back_populates="interactions")
 
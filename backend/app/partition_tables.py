@@ -0,0 +1,32 @@
+import os
+from sqlalchemy import create_engine
+from dotenv import load_dotenv
+from models import Base
+from partitions import PARTITIONED_TABLES, convert_to_partitioned, table_kind
+
+# Load environment variables
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
+
+# Get Supabase connection string from environment
+DB_URL = os.getenv("DATABASE_URL")
+if DB_URL and DB_URL.startswith("postgresql+asyncpg://"):
+    # Convert asyncpg URL to psycopg2 URL
+    DB_URL = DB_URL.replace("postgresql+asyncpg://", "postgresql://")
+
+engine = create_engine(DB_URL)
+
+def partition_tables():
+    # Rebuild messages/interactions created before partitioning; each table in its own transaction
+    for table in PARTITIONED_TABLES:
+        try:
+            with engine.begin() as conn:
+                if table_kind(conn, table) != "r":
+                    print(f"{table}: nothing to convert")
+                    continue
+                copied = convert_to_partitioned(conn, Base.metadata.tables[table])
+            print(f"{table}: converted, {copied} rows copied")
+        except Exception as e:
+            print(f"Error converting {table}: {e}")
+
+if __name__ == "__main__":
+    partition_tables()
@@ -0,0 +1,318 @@
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Partitioned tables and the column each one is range-partitioned on (monthly)
+PARTITIONED_TABLES = {
+    "messages": "created_at",
+    "interactions": "timestamp",
+}
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+ARCHIVE_AFTER_MONTHS = int(os.getenv("ARCHIVE_AFTER_MONTHS", "12"))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.path.dirname(__file__), '..', 'archive'))
+
+# Default lower bound for time-ranged CRUD reads, counted back from the page
+# cursor; callers widen it by passing `since` (e.g. datetime.min for all history)
+QUERY_WINDOW = timedelta(days=int(os.getenv("QUERY_WINDOW_DAYS", "365")))
+
+# pg advisory lock key serialising partition maintenance across workers
+PARTITION_LOCK_KEY = 726_574_221
+
+# How long DDL on a parent table may wait for its lock before giving up,
+# so maintenance never queues every reader and writer behind it
+PARTITION_LOCK_TIMEOUT = os.getenv("PARTITION_LOCK_TIMEOUT", "5s")
+
+
+def month_start(value: datetime) -> datetime:
+    """Truncate a datetime to the first instant of its month"""
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    """Shift a month-start datetime by a number of months"""
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    """Name of the partition holding `month`, e.g. messages_y2025m04"""
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    """Name of the partition catching rows outside every monthly partition"""
+    return f"{table}_default"
+
+
+def parse_partition_name(table: str, name: str) -> Optional[datetime]:
+    """Inverse of `partition_name`; None if `name` isn't a monthly partition of `table`"""
+    match = re.fullmatch(rf"{re.escape(table)}_y(\d{{4}})m(\d{{2}})", name)
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1)
+
+
+def cold_partitions(
+    partitions: Iterable[Tuple[str, datetime, bool]],
+    older_than_months: int,
+    now: Optional[datetime] = None,
+) -> List[Tuple[str, datetime, bool]]:
+    """Partitions whose whole month ended at least `older_than_months` before the current month"""
+    cutoff = add_months(month_start(now or datetime.utcnow()), -older_than_months)
+    return [p for p in partitions if add_months(p[1], 1) <= cutoff]
+
+
+def query_window_start(before: Optional[datetime] = None) -> datetime:
+    """Default `since` for a page of rows older than `before` (or now)"""
+    return (before or datetime.utcnow()) - QUERY_WINDOW
+
+
+def table_kind(conn, table: str) -> Optional[str]:
+    """pg_class.relkind of `table`: 'p' partitioned, 'r' plain, None if missing"""
+    return conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table},
+    ).scalar()
+
+
+def list_partitions(conn, table: str) -> List[Tuple[str, datetime, bool]]:
+    """
+    Return (name, month, attached) for each monthly partition table of `table`,
+    oldest first. Detached ones are left over from an interrupted archive run.
+    """
+    result = conn.execute(
+        text("SELECT relname, relispartition FROM pg_class WHERE relkind = 'r' AND starts_with(relname, :prefix)"),
+        {"prefix": f"{table}_y"},
+    )
+    partitions = []
+    for name, attached in result:
+        month = parse_partition_name(table, name)
+        if month is not None:
+            partitions.append((name, month, attached))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def _set_lock_timeout(conn) -> None:
+    conn.execute(text(f"SET LOCAL lock_timeout = '{PARTITION_LOCK_TIMEOUT}'"))
+
+
+def create_partition(conn, table: str, month: datetime) -> None:
+    """
+    Create the partition for `month`. Rows already sitting in the default
+    partition for that month are moved into it, since Postgres refuses to
+    create a partition whose range the default partition already holds.
+    """
+    column = PARTITIONED_TABLES[table]
+    name = partition_name(table, month)
+    default = default_partition_name(table)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    in_range = f"{column} >= :start AND {column} < :end"
+
+    has_default = table_kind(conn, default) is not None
+    moving = has_default and conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})"), bounds
+    ).scalar()
+
+    if moving:
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+    conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    ))
+    if moving:
+        conn.execute(text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_range}"), bounds)
+        conn.execute(text(f"DELETE FROM {default} WHERE {in_range}"), bounds)
+        conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+
+
+def ensure_table_partitions(
+    conn,
+    table: str,
+    months_ahead: int = PARTITION_MONTHS_AHEAD,
+    now: Optional[datetime] = None,
+) -> None:
+    """
+    Create the current month's partition, `months_ahead` future ones and the
+    default partition for `table`. Months that have collected rows in the
+    default partition (backdated or far-future values) get their own
+    partition too, so those rows become archivable.
+    """
+    kind = table_kind(conn, table)
+    if kind is None:
+        raise RuntimeError(f"Table {table} does not exist; create the schema first")
+    if kind != "p":
+        raise RuntimeError(
+            f"Table {table} exists but is not partitioned. Convert it with "
+            f"`python partition_tables.py` from backend/app (locks the table while rows are copied)"
+        )
+
+    _set_lock_timeout(conn)
+    column = PARTITIONED_TABLES[table]
+    default = default_partition_name(table)
+    current = month_start(now or datetime.utcnow())
+    wanted = {add_months(current, offset) for offset in range(months_ahead + 1)}
+
+    if table_kind(conn, default) is not None:
+        result = conn.execute(text(f"SELECT DISTINCT date_trunc('month', {column}) FROM {default}"))
+        wanted.update(month_start(month) for (month,) in result)
+
+    existing = set()
+    for name, month, attached in list_partitions(conn, table):
+        if not attached:
+            # Left detached by an interrupted archive run, which finishes it next time;
+            # its rows for this month stay in the default partition until then
+            logger.warning("Skipping %s: detached, run archive_partitions.py to finish archiving it", name)
+        existing.add(month)
+    for month in sorted(wanted - existing):
+        create_partition(conn, table, month)
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {default} PARTITION OF {table} DEFAULT"))
+
+
+def ensure_partitions(
+    conn,
+    months_ahead: int = PARTITION_MONTHS_AHEAD,
+    now: Optional[datetime] = None,
+) -> Dict[str, Exception]:
+    """
+    Run `ensure_table_partitions` for every partitioned table, each in its own
+    savepoint so one failing table doesn't roll back the others. Failures are
+    logged and returned by table name. Takes a sync connection, so async
+    callers use `conn.run_sync(ensure_partitions)`.
+
+    Holds an advisory lock until the transaction ends; if another worker is
+    already doing maintenance this returns immediately without changes.
+    """
+    if conn.dialect.name != "postgresql":
+        return {}
+    locked = conn.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY}).scalar()
+    if not locked:
+        logger.info("Partition maintenance already running in another worker; skipping")
+        return {}
+
+    failures = {}
+    for table in PARTITIONED_TABLES:
+        try:
+            with conn.begin_nested():
+                ensure_table_partitions(conn, table, months_ahead, now)
+        except Exception as e:
+            logger.error("Could not create partitions for %s: %s", table, e)
+            failures[table] = e
+    return failures
+
+
+def _archive_path(name: str, archive_dir: str) -> str:
+    """Export path for a partition, never overwriting an earlier export of the same month"""
+    path = os.path.join(archive_dir, f"{name}.jsonl.gz")
+    suffix = 1
+    while os.path.exists(path):
+        path = os.path.join(archive_dir, f"{name}_{suffix}.jsonl.gz")
+        suffix += 1
+    return path
+
+
+def export_table(engine, name: str, archive_dir: str = ARCHIVE_DIR) -> str:
+    """Stream every row of `name` to a gzipped JSON lines file and fsync it. Returns its path"""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = _archive_path(name, archive_dir)
+    partial = f"{path}.partial"
+
+    with engine.connect() as conn:
+        rows = conn.execution_options(stream_results=True).execute(text(f"SELECT * FROM {name}"))
+        with open(partial, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                for row in rows.mappings():
+                    f.write((json.dumps(dict(row), default=str) + "\n").encode("utf-8"))
+            raw.flush()
+            os.fsync(raw.fileno())
+
+    os.replace(partial, path)
+    dir_fd = os.open(archive_dir, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+    return path
+
+
+def archive_partition(engine, table: str, name: str, attached: bool = True, archive_dir: str = ARCHIVE_DIR) -> str:
+    """
+    Detach a partition in its own short transaction, export the detached table
+    outside any lock on `table`, then drop it once the export is on disk.
+    Returns the path of the export file.
+    """
+    if attached:
+        with engine.begin() as conn:
+            _set_lock_timeout(conn)
+            conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+
+    path = export_table(engine, name, archive_dir)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE {name}"))
+    return path
+
+
+def archive_old_partitions(
+    engine,
+    older_than_months: int = ARCHIVE_AFTER_MONTHS,
+    archive_dir: str = ARCHIVE_DIR,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """Archive every monthly partition that ended more than `older_than_months` ago"""
+    if engine.dialect.name != "postgresql":
+        return []
+
+    with engine.connect() as conn:
+        cold = [
+            (table, name, attached)
+            for table in PARTITIONED_TABLES
+            for name, _, attached in cold_partitions(list_partitions(conn, table), older_than_months, now)
+        ]
+
+    return [
+        archive_partition(engine, table, name, attached, archive_dir)
+        for table, name, attached in cold
+    ]
+
+
+def convert_to_partitioned(conn, table_obj, now: Optional[datetime] = None) -> int:
+    """
+    Rebuild an existing plain table as the partitioned `table_obj` and copy its
+    rows across. Holds an exclusive lock on the table for the whole copy, so
+    run it in a maintenance window. Returns the number of rows copied.
+    """
+    table = table_obj.name
+    column = PARTITIONED_TABLES[table]
+    old = f"{table}_unpartitioned"
+
+    # Move the old table and its indexes out of the way of the new names
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {old}"))
+    indexes = conn.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = :old"), {"old": old})
+    for (index,) in indexes.all():
+        conn.execute(text(f"ALTER INDEX {index} RENAME TO {index}_unpartitioned"))
+
+    table_obj.create(conn, checkfirst=True)
+
+    # Rows without a partition key can't be stored; stamp them with the conversion time
+    stamp = now or datetime.utcnow()
+    conn.execute(text(f"UPDATE {old} SET {column} = :stamp WHERE {column} IS NULL"), {"stamp": stamp})
+    result = conn.execute(text(f"SELECT DISTINCT date_trunc('month', {column}) FROM {old}"))
+    for (month,) in result.all():
+        create_partition(conn, table, month_start(month))
+    ensure_table_partitions(conn, table, now=now)
+
+    columns = ", ".join(c.name for c in table_obj.columns)
+    copied = conn.execute(text(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {old}")).rowcount
+    conn.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+    ))
+    conn.execute(text(f"DROP TABLE {old}"))
+    return copied
@@ -0,0 +1,177 @@
+import importlib
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../..', '.env'))
+
+
+def _positive(name: str, default: str, cast=float):
+    """Read a numeric setting that must be > 0 (a zero rate would never refill)"""
+    value = cast(os.getenv(name, default))
+    if value <= 0:
+        raise ValueError(f"{name} must be greater than 0, got {value}")
+    return value
+
+# Login admission settings (capacity = burst size, rate = tokens refilled per second)
+LOGIN_IP_CAPACITY = _positive("LOGIN_IP_CAPACITY", "20", int)
+LOGIN_IP_RATE = _positive("LOGIN_IP_RATE", "0.5")
+LOGIN_ACCOUNT_CAPACITY = _positive("LOGIN_ACCOUNT_CAPACITY", "5", int)
+LOGIN_ACCOUNT_RATE = _positive("LOGIN_ACCOUNT_RATE", "0.05")
+# Per process: with several workers the total is workers * LOGIN_MAX_CONCURRENT
+LOGIN_MAX_CONCURRENT = _positive("LOGIN_MAX_CONCURRENT", str(os.cpu_count() or 1), int)
+RATE_LIMIT_MAX_KEYS = _positive("RATE_LIMIT_MAX_KEYS", "100000", int)
+
+# Token bucket storage as "module:factory"; the factory is called with no
+# arguments and returns a RateLimitBackend. Empty means per-process memory
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "")
+
+# Reverse proxies allowed to set X-Forwarded-For (comma-separated addresses)
+TRUSTED_PROXIES = {a.strip() for a in os.getenv("TRUSTED_PROXIES", "").split(",") if a.strip()}
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for token buckets. Subclass to share buckets across workers
+    (e.g. a Redis script doing the same refill math).
+    """
+
+    @abstractmethod
+    async def take(self, key: str, capacity: int, rate: float) -> float:
+        """
+        Atomically take one token from `key`. Return 0 if allowed, else seconds
+        until a token is available
+        """
+
+    @abstractmethod
+    async def refund(self, key: str, capacity: int, rate: float) -> None:
+        """Give back a token taken by `take`, never exceeding `capacity`"""
+
+
+class InMemoryBackend(RateLimitBackend):
+    """Per-process token buckets stored as (tokens, updated_at) tuples in a bounded LRU"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def _tokens(self, key: str, capacity: int, rate: float, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return float(capacity)
+        tokens, updated_at = bucket
+        return min(float(capacity), tokens + (now - updated_at) * rate)
+
+    def _store(self, key: str, tokens: float, now: float) -> None:
+        # Re-insert at the end so the least recently seen keys are evicted first
+        self._buckets.pop(key, None)
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    async def take(self, key: str, capacity: int, rate: float) -> float:
+        # No await between read and write, so this is atomic within the event loop
+        now = self.clock()
+        tokens = self._tokens(key, capacity, rate, now)
+        wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+        if not wait:
+            tokens -= 1
+        self._store(key, tokens, now)
+        return wait
+
+    async def refund(self, key: str, capacity: int, rate: float) -> None:
+        now = self.clock()
+        self._store(key, min(float(capacity), self._tokens(key, capacity, rate, now) + 1), now)
+
+
+def load_backend(path: str = RATE_LIMIT_BACKEND) -> RateLimitBackend:
+    """Build the backend named by a "module:factory" path, or an InMemoryBackend if empty"""
+    if not path:
+        return InMemoryBackend()
+    module_name, _, factory_name = path.partition(":")
+    factory = getattr(importlib.import_module(module_name), factory_name)
+    backend = factory()
+    if not isinstance(backend, RateLimitBackend):
+        raise TypeError(f"RATE_LIMIT_BACKEND {path} returned {type(backend).__name__}, not a RateLimitBackend")
+    return backend
+
+
+def client_ip(peer: Optional[str], forwarded_for: Optional[str] = None) -> str:
+    """
+    Address to rate limit on. `X-Forwarded-For` is only honoured when the
+    direct peer is listed in TRUSTED_PROXIES; the right-most address not
+    belonging to a trusted proxy is the real client.
+    """
+    if not peer:
+        return "unknown"
+    if peer not in TRUSTED_PROXIES or not forwarded_for:
+        return peer
+    for address in reversed([a.strip() for a in forwarded_for.split(",") if a.strip()]):
+        if address not in TRUSTED_PROXIES:
+            return address
+    return peer
+
+
+class LoginAdmission:
+    """
+    Admission control for login attempts: per-IP and per-account token buckets
+    plus a cap on password verifications running at the same time.
+
+    Flow per attempt: `try_acquire` a slot, `admit` the IP and account,
+    verify the password, `record_success` on a good password, then `release`.
+    The buckets live in `backend` and can be shared between workers; the
+    concurrency cap is always per process.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[RateLimitBackend] = None,
+        max_concurrent: int = LOGIN_MAX_CONCURRENT,
+    ):
+        self.backend = backend or load_backend()
+        self.max_concurrent = max_concurrent
+        self._in_flight = 0
+
+    @staticmethod
+    def _account_key(email: str) -> str:
+        return f"login:account:{email.strip().lower()}"
+
+    async def admit(self, ip: str, email: str) -> float:
+        """
+        Take a token from the IP bucket, then reserve one from the account bucket.
+        Return 0 if admitted, else seconds to wait. The account is only charged
+        once the IP is admitted, so a throttled IP can't drain it, and the
+        reservation happens before verifying, so parallel attempts can't all slip past it.
+        """
+        ip_wait = await self.backend.take(f"login:ip:{ip}", LOGIN_IP_CAPACITY, LOGIN_IP_RATE)
+        if ip_wait:
+            return ip_wait
+        return await self.backend.take(self._account_key(email), LOGIN_ACCOUNT_CAPACITY, LOGIN_ACCOUNT_RATE)
+
+    async def record_success(self, email: str) -> None:
+        """Refund the account token reserved by `admit`, so successful logins don't drain it"""
+        await self.backend.refund(self._account_key(email), LOGIN_ACCOUNT_CAPACITY, LOGIN_ACCOUNT_RATE)
+
+    def try_acquire(self) -> bool:
+        """Reserve a verification slot without waiting. Return False if all slots are busy"""
+        if self._in_flight >= self.max_concurrent:
+            return False
+        self._in_flight += 1
+        return True
+
+    def release(self) -> None:
+        """Release a slot reserved by `try_acquire`"""
+        self._in_flight -= 1
+
+
+login_admission = LoginAdmission()
+
+
+def configure_backend(backend: RateLimitBackend) -> None:
+    """Swap the bucket storage used by `login_admission`, e.g. from a startup hook"""
+    login_admission.backend = backend
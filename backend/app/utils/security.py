@@ -16,6 +16,9 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30  # 30 minutes by default
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified against for unknown emails so every login attempt costs one bcrypt check
+DUMMY_PASSWORD_HASH = pwd_context.hash("vynetree-dummy-password")
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify that a plain password matches the hashed password"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import auth
+from app.database import get_db
+from app.utils.rate_limit import LOGIN_ACCOUNT_CAPACITY, InMemoryBackend, LoginAdmission
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    admission = LoginAdmission(backend=InMemoryBackend(), max_concurrent=1)
+    monkeypatch.setattr(auth, "login_admission", admission)
+    return admission
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api/auth")
+
+    async def no_db():
+        yield None
+
+    app.dependency_overrides[get_db] = no_db
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def login(client):
+    return client.post("/api/auth/login", data={"username": "user@x", "password": "wrong"})
+
+
+def test_bad_password_is_401_and_releases_slot(client, admission, monkeypatch):
+    async def authenticate_user(db, email, password):
+        return None
+
+    monkeypatch.setattr(auth, "authenticate_user", authenticate_user)
+    assert login(client).status_code == 401
+    assert admission._in_flight == 0
+
+
+def test_slot_released_when_authenticate_raises(client, admission, monkeypatch):
+    async def authenticate_user(db, email, password):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(auth, "authenticate_user", authenticate_user)
+    assert login(client).status_code == 500
+    assert admission._in_flight == 0
+
+
+def test_rate_limited_login_is_429_with_retry_after(client, admission, monkeypatch):
+    async def authenticate_user(db, email, password):
+        return None
+
+    monkeypatch.setattr(auth, "authenticate_user", authenticate_user)
+    monkeypatch.setattr(auth.login_admission.backend, "take", _empty_bucket)
+    response = login(client)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+    assert admission._in_flight == 0
+
+
+def test_concurrency_cap_is_429_without_charging_buckets(client, admission, monkeypatch):
+    called = []
+
+    async def authenticate_user(db, email, password):
+        called.append(email)
+        return None
+
+    monkeypatch.setattr(auth, "authenticate_user", authenticate_user)
+    assert admission.try_acquire()  # occupy the only slot
+    response = login(client)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert called == []
+    assert len(admission.backend._buckets) == 0
+
+
+def test_failed_login_keeps_account_token_and_success_refunds_it(client, admission, monkeypatch):
+    user = SimpleNamespace(
+        id=1, username="user", email="user@x.com", name="User",
+        profilePicture=None, subscriptionPlan="Free", created_at=None,
+    )
+    results = [None, user]
+
+    async def authenticate_user(db, email, password):
+        return results.pop(0)
+
+    monkeypatch.setattr(auth, "authenticate_user", authenticate_user)
+    bucket = "login:account:user@x"
+    assert login(client).status_code == 401
+    assert admission.backend._buckets[bucket][0] == pytest.approx(LOGIN_ACCOUNT_CAPACITY - 1, abs=0.01)
+    assert login(client).status_code == 200
+    assert admission.backend._buckets[bucket][0] == pytest.approx(LOGIN_ACCOUNT_CAPACITY - 1, abs=0.01)
+
+
+async def _empty_bucket(key, capacity, rate):
+    return 2.5
@@ -0,0 +1,231 @@
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+
+from app import partitions
+from app.partitions import (
+    add_months,
+    archive_partition,
+    cold_partitions,
+    create_partition,
+    ensure_partitions,
+    ensure_table_partitions,
+    list_partitions,
+    month_start,
+    parse_partition_name,
+    partition_name,
+)
+
+
+class FakeResult:
+    def __init__(self, rows=(), scalar=None):
+        self.rows = list(rows)
+        self.value = scalar
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def scalar(self):
+        return self.value
+
+
+class FakeConnection:
+    """
+    Records executed SQL. `handler(sql, params)` returns a FakeResult for
+    statements whose result matters; anything else gets `rows`.
+    """
+
+    def __init__(self, rows=(), dialect="postgresql", handler=None, log=None):
+        self.rows = list(rows)
+        self.dialect = type("Dialect", (), {"name": dialect})()
+        self.handler = handler
+        self.statements = log if log is not None else []
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        self.statements.append(sql)
+        result = self.handler(sql, params) if self.handler else None
+        return result if result is not None else FakeResult(self.rows)
+
+    @contextmanager
+    def begin_nested(self):
+        yield
+
+
+class FakeEngine:
+    """Hands out FakeConnections that share one statement log"""
+
+    def __init__(self, handler=None):
+        self.handler = handler
+        self.log = []
+
+    @contextmanager
+    def begin(self):
+        self.log.append("BEGIN")
+        yield FakeConnection(handler=self.handler, log=self.log)
+        self.log.append("COMMIT")
+
+
+def test_month_start():
+    assert month_start(datetime(2026, 10, 19, 13, 45)) == datetime(2026, 10, 1)
+
+
+def test_add_months_across_year_boundaries():
+    assert add_months(datetime(2026, 11, 1), 1) == datetime(2026, 12, 1)
+    assert add_months(datetime(2026, 12, 1), 1) == datetime(2027, 1, 1)
+    assert add_months(datetime(2026, 1, 1), -1) == datetime(2025, 12, 1)
+    assert add_months(datetime(2026, 10, 1), -12) == datetime(2025, 10, 1)
+    assert add_months(datetime(2026, 10, 1), 27) == datetime(2029, 1, 1)
+
+
+def test_partition_name_round_trip():
+    month = datetime(2025, 4, 1)
+    assert partition_name("messages", month) == "messages_y2025m04"
+    assert parse_partition_name("messages", "messages_y2025m04") == month
+
+
+def test_parse_partition_name_rejects_other_tables():
+    assert parse_partition_name("messages", "messages_default") is None
+    assert parse_partition_name("messages", "messages_y2025m13") is None
+    assert parse_partition_name("messages", "messages_y2025m04_old") is None
+    assert parse_partition_name("messages", "interactions_y2025m04") is None
+
+
+def test_list_partitions_parses_and_sorts():
+    conn = FakeConnection([
+        ("messages_y2026m01", True),
+        ("messages_y2025m12", False),
+        ("messages_yearly_stats", True),
+    ])
+    assert list_partitions(conn, "messages") == [
+        ("messages_y2025m12", datetime(2025, 12, 1), False),
+        ("messages_y2026m01", datetime(2026, 1, 1), True),
+    ]
+
+
+def test_cold_partitions_cutoff_is_whole_months():
+    now = datetime(2026, 10, 19)
+    months = [datetime(2025, 9, 1), datetime(2025, 10, 1), datetime(2025, 11, 1)]
+    found = cold_partitions([(partition_name("messages", m), m, True) for m in months], 12, now)
+    # Cutoff is 2025-10-01: September 2025 has fully ended before it, October hasn't
+    assert [name for name, _, _ in found] == ["messages_y2025m09"]
+
+
+def test_cold_partitions_on_first_instant_of_month():
+    month = datetime(2025, 9, 1)
+    found = cold_partitions([("messages_y2025m09", month, True)], 12, datetime(2026, 10, 1))
+    assert len(found) == 1
+
+
+def test_ensure_partitions_skips_other_dialects():
+    conn = FakeConnection(dialect="sqlite")
+    assert ensure_partitions(conn) == {}
+    assert conn.statements == []
+
+
+def test_archive_path_never_overwrites(tmp_path):
+    first = partitions._archive_path("messages_y2025m01", str(tmp_path))
+    open(first, "w").close()
+    second = partitions._archive_path("messages_y2025m01", str(tmp_path))
+    assert os.path.basename(first) == "messages_y2025m01.jsonl.gz"
+    assert os.path.basename(second) == "messages_y2025m01_1.jsonl.gz"
+
+
+def test_create_partition_without_default_rows_is_a_plain_create():
+    def handler(sql, params):
+        if "to_regclass" in sql:
+            return FakeResult(scalar="r")
+        if "SELECT EXISTS" in sql:
+            return FakeResult(scalar=False)
+
+    conn = FakeConnection(handler=handler)
+    create_partition(conn, "messages", datetime(2027, 6, 1))
+    assert conn.statements[2] == (
+        "CREATE TABLE messages_y2027m06 PARTITION OF messages "
+        "FOR VALUES FROM ('2027-06-01T00:00:00') TO ('2027-07-01T00:00:00')"
+    )
+    assert len(conn.statements) == 3
+
+
+def test_create_partition_moves_default_rows_while_default_is_detached():
+    def handler(sql, params):
+        if "to_regclass" in sql:
+            return FakeResult(scalar="r")
+        if "SELECT EXISTS" in sql:
+            return FakeResult(scalar=True)
+
+    conn = FakeConnection(handler=handler)
+    create_partition(conn, "interactions", datetime(2027, 6, 1))
+    assert conn.statements[2:] == [
+        "ALTER TABLE interactions DETACH PARTITION interactions_default",
+        "CREATE TABLE interactions_y2027m06 PARTITION OF interactions "
+        "FOR VALUES FROM ('2027-06-01T00:00:00') TO ('2027-07-01T00:00:00')",
+        "INSERT INTO interactions_y2027m06 SELECT * FROM interactions_default "
+        "WHERE timestamp >= :start AND timestamp < :end",
+        "DELETE FROM interactions_default WHERE timestamp >= :start AND timestamp < :end",
+        "ALTER TABLE interactions ATTACH PARTITION interactions_default DEFAULT",
+    ]
+
+
+def test_ensure_table_partitions_refuses_unpartitioned_table():
+    conn = FakeConnection(handler=lambda sql, params: FakeResult(scalar="r") if "to_regclass" in sql else None)
+    with pytest.raises(RuntimeError, match="partition_tables.py"):
+        ensure_table_partitions(conn, "messages")
+    assert not any(sql.startswith("CREATE") for sql in conn.statements)
+
+
+def test_ensure_table_partitions_skips_detached_leftovers():
+    now = datetime(2026, 10, 19)
+
+    def handler(sql, params):
+        if "to_regclass" in sql:
+            return FakeResult(scalar="p" if params["table"] == "messages" else "r")
+        if "date_trunc" in sql:
+            # Default partition holds rows for a month whose partition is detached
+            return FakeResult([(datetime(2025, 3, 1),)])
+        if "relispartition" in sql:
+            return FakeResult([("messages_y2025m03", False)] + [
+                (partition_name("messages", add_months(datetime(2026, 10, 1), i)), True) for i in range(4)
+            ])
+
+    conn = FakeConnection(handler=handler)
+    ensure_table_partitions(conn, "messages", months_ahead=3, now=now)
+    assert not any("messages_y2025m03" in sql for sql in conn.statements)
+    assert conn.statements[-1] == "CREATE TABLE IF NOT EXISTS messages_default PARTITION OF messages DEFAULT"
+
+
+def test_ensure_partitions_skips_when_another_worker_holds_the_lock():
+    conn = FakeConnection(handler=lambda sql, params: FakeResult(scalar=False) if "advisory" in sql else None)
+    assert ensure_partitions(conn) == {}
+    assert len(conn.statements) == 1
+
+
+def test_archive_partition_detaches_then_exports_then_drops(monkeypatch):
+    engine = FakeEngine()
+
+    def export_table(engine_, name, archive_dir):
+        engine.log.append(f"EXPORT {name}")
+        return f"{archive_dir}/{name}.jsonl.gz"
+
+    monkeypatch.setattr(partitions, "export_table", export_table)
+    path = archive_partition(engine, "messages", "messages_y2025m01", archive_dir="/archive")
+    assert path == "/archive/messages_y2025m01.jsonl.gz"
+    assert engine.log == [
+        "BEGIN",
+        f"SET LOCAL lock_timeout = '{partitions.PARTITION_LOCK_TIMEOUT}'",
+        "ALTER TABLE messages DETACH PARTITION messages_y2025m01",
+        "COMMIT",
+        "EXPORT messages_y2025m01",
+        "BEGIN",
+        "DROP TABLE messages_y2025m01",
+        "COMMIT",
+    ]
+
+
+def test_archive_partition_resumes_detached_leftover(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(partitions, "export_table", lambda engine_, name, archive_dir: "path")
+    archive_partition(engine, "messages", "messages_y2025m01", attached=False, archive_dir="/archive")
+    assert engine.log == ["BEGIN", "DROP TABLE messages_y2025m01", "COMMIT"]
@@ -0,0 +1,203 @@
+import asyncio
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+# Runs against a real, disposable PostgreSQL database: its public schema is wiped.
+# e.g. TEST_DATABASE_URL=postgresql://postgres@localhost/vynetree_test
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+NOW = datetime(2026, 10, 19)
+
+
+def _url(driver):
+    return TEST_DATABASE_URL.replace("postgresql://", f"postgresql+{driver}://", 1)
+
+
+@pytest.fixture
+def engine():
+    pytest.importorskip("psycopg2")
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine(_url("psycopg2"))
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def schema(engine):
+    from sqlalchemy import text
+    from app.models import Base
+    from app.partitions import ensure_partitions
+
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        assert ensure_partitions(conn, now=NOW) == {}
+        conn.execute(text("INSERT INTO users (username, email, password_hash, name) VALUES ('u', 'e', 'h', 'n')"))
+        conn.execute(text("INSERT INTO contacts (user_id, name, relationship_tier) VALUES (1, 'c', 'Best')"))
+    return engine
+
+
+def _add_interaction(conn, timestamp):
+    from sqlalchemy import text
+
+    return conn.execute(
+        text("INSERT INTO interactions (user_id, contact_id, type, timestamp) VALUES (1, 1, 'Call', :ts) RETURNING id"),
+        {"ts": timestamp},
+    ).scalar()
+
+
+def _partitions(engine, table):
+    from app.partitions import list_partitions
+
+    with engine.connect() as conn:
+        return [(name, attached) for name, _, attached in list_partitions(conn, table)]
+
+
+def test_rows_in_default_partition_get_their_own_partition(schema):
+    from sqlalchemy import text
+    from app.partitions import ensure_partitions
+
+    with schema.begin() as conn:
+        _add_interaction(conn, datetime(2027, 6, 5))   # beyond the months created ahead
+        _add_interaction(conn, datetime(2025, 1, 3))   # backdated
+        assert conn.execute(text("SELECT count(*) FROM interactions_default")).scalar() == 2
+
+    # Previously failed: the default partition already held rows for June 2027
+    with schema.begin() as conn:
+        assert ensure_partitions(conn, now=datetime(2027, 4, 1)) == {}
+
+    names = [name for name, _ in _partitions(schema, "interactions")]
+    assert "interactions_y2025m01" in names and "interactions_y2027m06" in names
+    with schema.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM interactions_default")).scalar() == 0
+        assert conn.execute(text("SELECT count(*) FROM interactions")).scalar() == 2
+
+
+def test_archive_exports_then_drops_cold_partitions(schema, tmp_path):
+    from sqlalchemy import text
+    from app.partitions import archive_old_partitions, ensure_partitions
+
+    with schema.begin() as conn:
+        _add_interaction(conn, datetime(2025, 1, 3))
+        _add_interaction(conn, NOW)
+        ensure_partitions(conn, now=NOW)
+
+    paths = archive_old_partitions(schema, older_than_months=12, archive_dir=str(tmp_path), now=NOW)
+    assert [os.path.basename(p) for p in paths] == ["interactions_y2025m01.jsonl.gz"]
+    with gzip.open(paths[0], "rt") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["timestamp"] for row in rows] == ["2025-01-03 00:00:00"]
+    assert "interactions_y2025m01" not in [name for name, _ in _partitions(schema, "interactions")]
+    with schema.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM interactions")).scalar() == 1
+
+
+def test_detached_leftover_does_not_break_maintenance(schema, tmp_path):
+    from sqlalchemy import text
+    from app.partitions import archive_old_partitions, ensure_partitions
+
+    with schema.begin() as conn:
+        _add_interaction(conn, datetime(2025, 3, 2))
+        ensure_partitions(conn, now=NOW)
+        # Simulate an archive run interrupted after detaching
+        conn.execute(text("ALTER TABLE interactions DETACH PARTITION interactions_y2025m03"))
+        _add_interaction(conn, datetime(2025, 3, 9))  # lands in the default partition
+
+    with schema.begin() as conn:
+        assert ensure_partitions(conn, now=NOW) == {}
+    assert ("interactions_y2025m03", False) in _partitions(schema, "interactions")
+
+    # The next archive run finishes the leftover, then maintenance picks up the default row
+    assert len(archive_old_partitions(schema, 12, str(tmp_path), now=NOW)) == 1
+    with schema.begin() as conn:
+        assert ensure_partitions(conn, now=NOW) == {}
+    assert ("interactions_y2025m03", True) in _partitions(schema, "interactions")
+
+
+def test_concurrent_maintenance_is_skipped(schema):
+    from sqlalchemy import text
+    from app.partitions import PARTITION_LOCK_KEY, ensure_partitions
+
+    with schema.begin() as holder:
+        holder.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+        with schema.begin() as conn:
+            assert ensure_partitions(conn, months_ahead=6, now=NOW) == {}
+    assert "interactions_y2027m04" not in [name for name, _ in _partitions(schema, "interactions")]
+
+
+def test_convert_unpartitioned_table(engine):
+    from sqlalchemy import text
+    from app.models import Base
+    from app.partitions import convert_to_partitioned, ensure_partitions, table_kind
+
+    # The messages table as created before partitioning
+    with engine.begin() as conn:
+        Base.metadata.tables["users"].create(conn)
+        conn.execute(text("CREATE TYPE messagestatusenum AS ENUM ('Sent', 'Delivered', 'Read')"))
+        conn.execute(text(
+            "CREATE TABLE messages (id SERIAL PRIMARY KEY, sender_id int NOT NULL REFERENCES users(id), "
+            "receiver_id int NOT NULL REFERENCES users(id), content text NOT NULL, "
+            "status messagestatusenum, created_at timestamp)"
+        ))
+        conn.execute(text("CREATE INDEX ix_messages_id ON messages (id)"))
+        conn.execute(text("INSERT INTO users (username, email, password_hash, name) VALUES ('u', 'e', 'h', 'n')"))
+        conn.execute(text(
+            "INSERT INTO messages (sender_id, receiver_id, content, status, created_at) VALUES "
+            "(1, 1, 'a', 'Sent', '2024-05-01'), (1, 1, 'b', 'Read', NULL), (1, 1, 'c', 'Sent', '2026-10-01')"
+        ))
+
+    with engine.begin() as conn:
+        assert "messages" in ensure_partitions(conn, now=NOW)
+    with engine.begin() as conn:
+        assert convert_to_partitioned(conn, Base.metadata.tables["messages"], now=NOW) == 3
+
+    with engine.begin() as conn:
+        assert table_kind(conn, "messages") == "p"
+        assert table_kind(conn, "messages_unpartitioned") is None
+        new_id = conn.execute(text(
+            "INSERT INTO messages (sender_id, receiver_id, content, status, created_at) "
+            "VALUES (1, 1, 'd', 'Sent', :now) RETURNING id"
+        ), {"now": NOW}).scalar()
+        assert new_id == 4
+    assert "messages_y2024m05" in [name for name, _ in _partitions(engine, "messages")]
+
+
+def test_keyset_pages_through_tied_timestamps(schema):
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from app.crud.interactions import get_interactions_for_contact
+    from app.partitions import QUERY_WINDOW
+
+    # The default window is relative to the real clock
+    tied = datetime.utcnow().replace(microsecond=0) - timedelta(days=2)
+    with schema.begin() as conn:
+        ids = {_add_interaction(conn, tied) for _ in range(5)}
+        ids.add(_add_interaction(conn, tied + timedelta(days=1)))
+        ids.add(_add_interaction(conn, tied - QUERY_WINDOW * 2))  # outside the default window
+
+    async def pages(**kwargs):
+        engine = create_async_engine(_url("asyncpg"))
+        seen = []
+        try:
+            async with AsyncSession(engine) as db:
+                before = before_id = None
+                while True:
+                    page = await get_interactions_for_contact(db, 1, before=before, before_id=before_id, limit=2, **kwargs)
+                    if not page:
+                        return seen
+                    seen.extend(row.id for row in page)
+                    before, before_id = page[-1].timestamp, page[-1].id
+        finally:
+            await engine.dispose()
+
+    recent = asyncio.run(pages())
+    assert len(recent) == len(set(recent)) == 6
+    assert set(recent) == ids - {max(ids)}
+    assert set(asyncio.run(pages(since=datetime.min))) == ids
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from app.utils import rate_limit
+from app.utils.rate_limit import InMemoryBackend, LoginAdmission, RateLimitBackend, client_ip
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+def test_take_until_empty_then_refill():
+    clock = FakeClock()
+    backend = InMemoryBackend(clock=clock)
+    waits = [run(backend.take("k", 3, 0.5)) for _ in range(4)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == 2.0  # one token at 0.5/s
+
+    clock.now += 1.0
+    assert run(backend.take("k", 3, 0.5)) == 1.0
+    clock.now += 1.0
+    assert run(backend.take("k", 3, 0.5)) == 0.0
+
+
+def test_refill_is_capped_at_capacity():
+    clock = FakeClock()
+    backend = InMemoryBackend(clock=clock)
+    run(backend.take("k", 2, 1.0))
+    clock.now += 100
+    assert [run(backend.take("k", 2, 1.0)) for _ in range(3)] == [0.0, 0.0, 1.0]
+
+
+def test_refund_returns_token_up_to_capacity():
+    backend = InMemoryBackend(clock=FakeClock())
+    assert run(backend.take("k", 1, 1.0)) == 0.0
+    assert run(backend.take("k", 1, 1.0)) == 1.0
+    run(backend.refund("k", 1, 1.0))
+    run(backend.refund("k", 1, 1.0))
+    assert run(backend.take("k", 1, 1.0)) == 0.0
+    assert run(backend.take("k", 1, 1.0)) == 1.0
+
+
+def test_lru_eviction():
+    backend = InMemoryBackend(max_keys=2, clock=FakeClock())
+    run(backend.take("a", 1, 1.0))
+    run(backend.take("b", 1, 1.0))
+    run(backend.take("a", 1, 1.0))  # refreshes "a"
+    run(backend.take("c", 1, 1.0))
+    assert list(backend._buckets) == ["a", "c"]
+
+
+def test_concurrency_slots():
+    admission = LoginAdmission(max_concurrent=2)
+    assert admission.try_acquire()
+    assert admission.try_acquire()
+    assert not admission.try_acquire()
+    admission.release()
+    assert admission.try_acquire()
+
+
+def test_throttled_ip_does_not_drain_account(monkeypatch):
+    monkeypatch.setattr(rate_limit, "LOGIN_IP_CAPACITY", 1)
+    monkeypatch.setattr(rate_limit, "LOGIN_ACCOUNT_CAPACITY", 2)
+    admission = LoginAdmission(backend=InMemoryBackend(clock=FakeClock()))
+
+    assert run(admission.admit("1.1.1.1", "victim@x")) == 0
+    for _ in range(4):
+        assert run(admission.admit("1.1.1.1", "victim@x")) > 0
+    assert run(admission.admit("2.2.2.2", "victim@x")) == 0
+
+
+def test_successes_are_refunded(monkeypatch):
+    monkeypatch.setattr(rate_limit, "LOGIN_ACCOUNT_CAPACITY", 2)
+    admission = LoginAdmission(backend=InMemoryBackend(clock=FakeClock()))
+
+    for _ in range(5):
+        assert run(admission.admit("1.1.1.1", "user@x")) == 0
+        run(admission.record_success("User@X "))
+    assert run(admission.admit("1.1.1.1", "user@x")) == 0
+    assert run(admission.admit("1.1.1.1", "user@x")) == 0
+    assert run(admission.admit("2.2.2.2", "user@x")) > 0
+
+
+def test_concurrent_attempts_share_account_tokens(monkeypatch):
+    monkeypatch.setattr(rate_limit, "LOGIN_ACCOUNT_CAPACITY", 2)
+    admission = LoginAdmission(backend=InMemoryBackend(clock=FakeClock()), max_concurrent=8)
+
+    async def attempts():
+        # All admitted before any verification finishes
+        return await asyncio.gather(*(admission.admit(f"10.0.0.{i}", "victim@x") for i in range(8)))
+
+    waits = run(attempts())
+    assert sum(1 for wait in waits if wait == 0) == 2
+
+
+def test_non_positive_settings_are_rejected(monkeypatch):
+    monkeypatch.setenv("LOGIN_ACCOUNT_RATE", "0")
+    with pytest.raises(ValueError):
+        rate_limit._positive("LOGIN_ACCOUNT_RATE", "0.05")
+
+
+def test_load_backend_from_path():
+    assert isinstance(rate_limit.load_backend(""), InMemoryBackend)
+    assert isinstance(rate_limit.load_backend("app.utils.rate_limit:InMemoryBackend"), InMemoryBackend)
+    with pytest.raises(TypeError):
+        rate_limit.load_backend("collections:OrderedDict")
+
+
+def test_configure_backend(monkeypatch):
+    backend = InMemoryBackend()
+    monkeypatch.setattr(rate_limit.login_admission, "backend", rate_limit.login_admission.backend)
+    rate_limit.configure_backend(backend)
+    assert rate_limit.login_admission.backend is backend
+
+
+def test_client_ip_ignores_forwarded_for_from_untrusted_peer(monkeypatch):
+    monkeypatch.setattr(rate_limit, "TRUSTED_PROXIES", {"10.0.0.1"})
+    assert client_ip("9.9.9.9", "1.2.3.4") == "9.9.9.9"
+    assert client_ip(None) == "unknown"
+
+
+def test_client_ip_uses_right_most_untrusted_address(monkeypatch):
+    monkeypatch.setattr(rate_limit, "TRUSTED_PROXIES", {"10.0.0.1", "10.0.0.2"})
+    assert client_ip("10.0.0.1", "6.6.6.6, 1.2.3.4, 10.0.0.2") == "1.2.3.4"
+    assert client_ip("10.0.0.1", "10.0.0.2") == "10.0.0.1"
+    assert client_ip("10.0.0.1", None) == "10.0.0.1"
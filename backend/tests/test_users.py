@@ -0,0 +1,32 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.crud import users
+from app.utils.security import DUMMY_PASSWORD_HASH
+
+
+def test_unknown_email_still_verifies_against_dummy_hash(monkeypatch):
+    checked = []
+
+    async def get_user_by_email(db, email):
+        return None
+
+    def verify_password(password, password_hash):
+        checked.append(password_hash)
+        return True
+
+    monkeypatch.setattr(users, "get_user_by_email", get_user_by_email)
+    monkeypatch.setattr(users, "verify_password", verify_password)
+    assert asyncio.run(users.authenticate_user(None, "nobody@x", "pw")) is None
+    assert checked == [DUMMY_PASSWORD_HASH]
+
+
+def test_known_email_checks_its_own_hash(monkeypatch):
+    user = SimpleNamespace(password_hash=users.get_password_hash("secret"))
+
+    async def get_user_by_email(db, email):
+        return user
+
+    monkeypatch.setattr(users, "get_user_by_email", get_user_by_email)
+    assert asyncio.run(users.authenticate_user(None, "user@x", "secret")) is user
+    assert asyncio.run(users.authenticate_user(None, "user@x", "wrong")) is None